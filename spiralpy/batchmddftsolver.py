@@ -109,9 +109,8 @@ class BatchMddftSolver(SPSolver):
         
         self._func(dst, src)
         if self._problem.direction() == SP_INVERSE:
-            xp = get_array_module(dst)
-            scale = xp.size(dst) / self._problem.szBatch()
-            xp.divide(dst, scale, out=dst)
+            scale = dst.size / self._problem.szBatch()
+            self._scaleInPlace(dst, scale)
         return dst
 
     def _writeScript(self, script_file):
@@ -14,6 +14,7 @@ SP_SHARE_DIR    = 'share'
 
 # environment varibles
 
+SP_FFT_BACKEND   = 'SP_FFT_BACKEND'
 SP_KEEPTEMP      = 'SP_KEEPTEMP'
 SP_LIBRARY_PATH  = 'SP_LIBRARY_PATH'
 SP_PRINTRULETREE = 'SP_PRINTRULETREE'
@@ -22,6 +23,7 @@ SP_WORKDIR       = 'SP_WORKDIR'
 # options
 
 SP_OPT_COLMAJOR         = 'colmajor'
+SP_OPT_FFTBACKEND       = 'fftbackend'
 SP_OPT_KEEPTEMP         = 'keeptemp'
 SP_OPT_METADATA         = 'metadata'
 SP_OPT_MPI              = 'mpi'
@@ -34,6 +36,12 @@ SP_OPT_REALCTYPE        = 'realctype'
 SP_FORWARD  = -1
 SP_INVERSE  = 1
 
+# host FFT backends, used by the Python definitions
+
+SP_FFT_FFTW     = 'fftw'
+SP_FFT_NUMPY    = 'numpy'
+SP_FFT_SCIPY    = 'scipy'
+
 # platforms
 
 SP_CPU  = 'CPU'
@@ -35,6 +35,8 @@ class HockneyProblem(SPProblem):
 
 
 class HockneySolver(SPSolver):
+    _mainFuncArgCount = 3
+    
     def __init__(self, problem: HockneyProblem, opts = {}):
         if not isinstance(problem, HockneyProblem):
             raise TypeError("problem must be a HockneyProblem")
@@ -48,6 +50,10 @@ class HockneySolver(SPSolver):
         namebase = "hockney" + c + n + c + ns + c + nd
         super(HockneySolver, self).__init__(problem, namebase, opts)
 
+    def _arrayModule(self):
+        # Hockney definition and solve always work on NumPy arrays
+        return np
+
     def _buildSymbol(self, problem):
         """ Build symbol (build is in order x-->y-->z) """
         
@@ -86,7 +92,7 @@ class HockneySolver(SPSolver):
         Nd = self._problem.dimND()
         
         # Hockney operations
-        In = self.zeroEmbedBox(src, ((0,N-Ns),)) # zero pad input data 
+        In = self.zeroEmbedBox(src, ((0,N-Ns),), scratch=True) # zero pad input data 
         FFT = self.rfftn(In)            # execute real forward dft on rank 3 data 
         P = self.pointwise(FFT, self._symbol) # execute pointwise operation
         IFFT = self.irfftn(P, shape=In.shape)  # execute real backward dft on rank 3 data
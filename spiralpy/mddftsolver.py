@@ -77,8 +77,7 @@ class MddftSolver(SPSolver):
             
         self._func(dst, src)
         if self._problem.direction() == SP_INVERSE:
-            xp = get_array_module(dst)
-            xp.divide(dst, xp.size(dst), out=dst)
+            self._scaleInPlace(dst, dst.size)
         return dst
 
     def _writeScript(self, script_file):
@@ -23,6 +23,9 @@ try:
 except ModuleNotFoundError:
     cp = None
 
+# most output arrays kept for reuse by one solver
+_DST_POOL_MAX = 4
+
 class MdrconvProblem(SPProblem):
     """define cyclic convolution problem."""
 
@@ -39,6 +42,8 @@ class MdrconvProblem(SPProblem):
 
 
 class MdrconvSolver(SPSolver):
+    _mainFuncArgCount = 3
+    
     def __init__(self, problem: MdrconvProblem, opts = {}):
         if not isinstance(problem, MdrconvProblem):
             raise TypeError("problem must be an MdrconvProblem")
@@ -55,6 +60,15 @@ class MdrconvSolver(SPSolver):
         namebase = typ + 'Mdrconv_' + ns
 
         opts[SP_OPT_METADATA] = True
+        
+        # problem dimensions and normalization, looked up once
+        (self._n1, self._n2, self._n3) = problem.dimensions()[:3]
+        self._invN = 1.0 / (self._n1 * self._n2 * self._n3)
+        
+        # prepared symbol stored by setSymbol(), used when solve gets no sym
+        self._sym = None
+        # output arrays handed back through release(), reused by solve
+        self._dstPool = []
 
         super(MdrconvSolver, self).__init__(problem, namebase, opts)
 
@@ -72,54 +86,113 @@ class MdrconvSolver(SPSolver):
     def runDef(self, src, sym):
         """Solve using internal Python definition."""
         
-        srcF = self.rfftn(src)
-        P = self.pointwise(srcF, sym)
-        out = self.irfftn(P, shape=src.shape)
+        if self._tracingOn:
+            # separate steps, each adds its node to the call graph
+            srcF = self.rfftn(src)
+            P = self.pointwise(srcF, sym)
+            out = self.irfftn(P, shape=src.shape)
+        else:
+            # pointwise writes into the forward buffer when the result allows,
+            # and the inverse may then consume it in place
+            srcF = self._execRfftn(src, scratch=True)
+            P = self.pointwise(srcF, sym)
+            out = self._execIrfftn(P, src.shape, overwrite=True)
         
         return out
     
-    def solve(self, src, sym, dst=None):
-        """Call SPIRAL-generated code"""
-        
-        xp = sp.get_array_module(src)
+    def _sliceSym(self, sym):
+        """Return the half-spectrum of sym, a view if sym is a full cube"""
         
         #slice sym if it's a cube
         shape = sym.shape
         if shape[0] == shape[2]:
             N = shape[0]
             Nx = (N // 2) + 1
-            sym = xp.ascontiguousarray(sym[:, :, :Nx])
+            sym = sym[:, :, :Nx]
+        return sym
+    
+    def setSymbol(self, sym):
+        """Prepare sym once for repeated calls to solve(src) without a sym
+        
+        The stored copy carries the 1/(n1*n2*n3) normalization, so those
+        solves skip the scaling pass over dst.  Call setSymbol again after
+        changing sym.
+        """
+        
+        xp = self._xp
+        # scale and copy in one pass
+        symC = xp.multiply(self._sliceSym(sym), self._invN)
+        if not symC.flags.c_contiguous:
+            symC = xp.ascontiguousarray(symC)
+        self._sym = symC
+    
+    def solve(self, src, sym=None, dst=None):
+        """Call SPIRAL-generated code
+        
+        If sym is None, the prescaled symbol given to setSymbol() is used.
+        Otherwise sym is passed through (copied only if sliced from a full
+        cube or not C ordered) and dst is normalized after the call.  Either
+        way dst is returned normalized, matching runDef.  If dst is None, an
+        array previously given to release() is reused when one is available.
+        """
+        
+        xp = self._xp
+        
+        if type(sym) == type(None):
+            if type(self._sym) == type(None):
+                raise RuntimeError('no symbol given and none set with setSymbol')
+            sym = self._sym
+            scaled = True
+        else:
+            # a half-spectrum from rfftn is already C ordered and passes through
+            # uncopied, a slice of a full cube is strided and must be copied
+            sym = xp.ascontiguousarray(self._sliceSym(sym))
+            scaled = False
                 
-        n1 = self._problem.dimensions()[0]
-        n2 = self._problem.dimensions()[1]
-        n3 = self._problem.dimensions()[2]
         if type(dst) == type(None):
-            dst = xp.zeros((n1,n2,n3), src.dtype)
+            # SPIRAL writes every output point, so a pooled array needs no zeroing
+            pool = self._dstPool
+            if len(pool) > 0 and pool[-1].dtype == src.dtype:
+                dst = pool.pop()
+            else:
+                dst = xp.zeros((self._n1,self._n2,self._n3), src.dtype)
         self._func(dst, src, sym)
-        xp.divide(dst, n1*n2*n3, out=dst)
+        if not scaled:
+            self._scaleInPlace(dst, self._n1*self._n2*self._n3)
         return dst
+    
+    def release(self, dst):
+        """Return an output array from solve for reuse; do not use it afterwards"""
+        
+        if not isinstance(dst, self._xp.ndarray):
+            raise RuntimeError('release requires a ' + self._xp.__name__ + ' array for this platform')
+        if tuple(dst.shape) != (self._n1, self._n2, self._n3) or not dst.flags.c_contiguous:
+            raise RuntimeError('release requires a C ordered array of the problem dimensions')
+        if dst.dtype != self._ftype:
+            raise RuntimeError('release requires an array of the solver precision')
+        if not dst.flags.owndata:
+            # a view would let a later solve write into the caller's base array
+            raise RuntimeError('release requires an array that owns its data, not a view')
+        if any(p is dst for p in self._dstPool):
+            raise RuntimeError('array has already been released')
+        if len(self._dstPool) < _DST_POOL_MAX:
+            self._dstPool.append(dst)
  
     def _func(self, dst, src, sym):
         """Call the SPIRAL generated main function"""
                 
-        xp = sp.get_array_module(src)
+        xp = self._xp
         
         if xp == np: 
-            if self._genCuda or self._genHIP:
-                raise RuntimeError('GPU function requires CuPy arrays')
+            if not isinstance(src, np.ndarray):
+                raise RuntimeError('CPU function requires NumPy arrays')
             # NumPy array on CPU
-            return self._MainFunc( 
-                    dst.ctypes.data_as(ctypes.c_void_p),
-                    src.ctypes.data_as(ctypes.c_void_p),
-                    sym.ctypes.data_as(ctypes.c_void_p)  )
+            return self._MainFunc(dst.ctypes.data, src.ctypes.data, sym.ctypes.data)
         else:
-            if not self._genCuda and not self._genHIP:
-                raise RuntimeError('CPU function requires NumPy arrays')
+            if not isinstance(src, cp.ndarray):
+                raise RuntimeError('GPU function requires CuPy arrays')
             # CuPy array on GPU
-            dstdev = ctypes.cast(dst.data.ptr, ctypes.POINTER(ctypes.c_void_p))
-            srcdev = ctypes.cast(src.data.ptr, ctypes.POINTER(ctypes.c_void_p))
-            symdev = ctypes.cast(sym.data.ptr, ctypes.POINTER(ctypes.c_void_p))
-            return self._MainFunc(dstdev, srcdev, symdev)
+            return self._MainFunc(dst.data.ptr, src.data.ptr, sym.data.ptr)
   
 
     def _writeScript(self, script_file):
@@ -172,18 +245,24 @@ class MdrconvSolver(SPSolver):
     def buildTestInput(self):
         """ Build test input cube """
         
-        xp = cp if self._genCuda or self._genHIP else np
-        n1 = self._problem.dimensions()[0]
-        n2 = self._problem.dimensions()[1]
-        n3 = self._problem.dimensions()[2]
+        xp = self._xp
+        (n1, n2, n3) = (self._n1, self._n2, self._n3)
+        
+        # generate directly in the target precision, no float64 intermediate
+        rng = xp.random.default_rng(0)
+        testSrc = rng.random((n1,n2,n3), dtype=self._ftype)
         
-        testSrc = xp.random.rand(n1,n2,n3).astype(self._ftype)
+        if self._tracingOn:
+            # tracing only needs the symbol's shape and type, skip the FFT
+            testSym = xp.zeros((n1, n2, n3 // 2 + 1), dtype=self._cxtype, order='C')
+            return (testSrc, testSym)
         
-        symIn = xp.random.rand(n1,n2,n3).astype(self._ftype)
-        testSym = xp.fft.rfftn(symIn)
+        symIn = rng.random((n1,n2,n3), dtype=self._ftype)
+        testSym = self._execRfftn(symIn)
         
-        #NumPy returns Fortran ordering from FFTs, and always double complex
-        if xp == np:
+        #NumPy returns Fortran ordering from FFTs, and always double complex;
+        #SciPy and pyFFTW keep the input precision and C ordering
+        if xp == np and self._fftBackend == SP_FFT_NUMPY:
             testSym = np.asanyarray(testSym, dtype=self._cxtype, order='C')
         
         return (testSrc, testSym)
@@ -39,6 +39,8 @@ class MdrfsconvProblem(SPProblem):
 
 
 class MdrfsconvSolver(SPSolver):
+    _mainFuncArgCount = 3
+    
     def __init__(self, problem: MdrfsconvProblem, opts = {}):
         if not isinstance(problem, MdrfsconvProblem):
             raise TypeError("problem must be an MdrfsconvProblem")
@@ -86,7 +88,7 @@ class MdrfsconvSolver(SPSolver):
         
     
         # Mdrfsconv operations
-        In = self.zeroEmbedBox(src, ((Ns1,0),(Ns2,0),(Ns3,0))) # zero pad input data 
+        In = self.zeroEmbedBox(src, ((Ns1,0),(Ns2,0),(Ns3,0)), scratch=True) # zero pad input data 
         FFT = self.rfftn(In)            # execute real forward dft on rank 3 data      
         P = self.pointwise(FFT, sym) # execute pointwise operation
         IFFT = self.irfftn(P, shape=In.shape)  # execute real backward dft on rank 3 data
@@ -112,7 +114,7 @@ class MdrfsconvSolver(SPSolver):
         if type(dst) == type(None):
             dst = xp.zeros((n1,n2,n3), src.dtype)
         self._func(dst, src, sym)
-        xp.divide(dst, n1*n2*n3*8, out=dst)
+        self._scaleInPlace(dst, n1*n2*n3*8)
         return dst
  
     def _func(self, dst, src, sym):
@@ -12,6 +12,7 @@ import spiralpy as sp
 from spiralpy.metadata import *
 from spiralpy.spiral import *
 
+import collections
 import datetime
 import subprocess
 import os
@@ -29,10 +30,80 @@ try:
 except ModuleNotFoundError:
     cp = None
 
+try:
+    import cupyx.scipy.fft as cpfft
+except ModuleNotFoundError:
+    cpfft = None
+
+try:
+    import scipy.fft as spfft
+except ModuleNotFoundError:
+    spfft = None
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ModuleNotFoundError:
+    pyfftw = None
+
 import ctypes
 import sys
 
 
+if cp != None:
+    # in-place scaling as a single fused kernel on the GPU
+    _scaleKernel = cp.ElementwiseKernel('T invN', 'T x', 'x *= invN', 'sp_scale')
+else:
+    _scaleKernel = None
+
+# shared libraries opened by any solver, keyed by full path
+_CDLL_CACHE = {}
+
+def _loadSharedLib(path):
+    """Open the shared library at path once per process"""
+    lib = _CDLL_CACHE.get(path)
+    if lib == None:
+        lib = ctypes.CDLL(path)
+        _CDLL_CACHE[path] = lib
+    return lib
+
+# results of findFunctionsWithMetadata for this process, keyed by the
+# search metadata and the library path setting
+_METADATA_SCAN_CACHE = {}
+
+def _findFunctionsCached(metavals):
+    """Memoized findFunctionsWithMetadata for the default library dirs"""
+    items = [(k, tuple(v) if type(v) is list else v) for (k, v) in metavals.items()]
+    key = (tuple(sorted(items)), os.getenv(SP_LIBRARY_PATH))
+    if key not in _METADATA_SCAN_CACHE:
+        _METADATA_SCAN_CACHE[key] = findFunctionsWithMetadata(metavals)
+    return _METADATA_SCAN_CACHE[key]
+
+# pyFFTW plans shared by all solvers, keyed on transform, shape and dtype;
+# each plan works on its own arrays, never on a caller's.  Each holds two
+# volume sized buffers, so only the most recently used few are kept.
+_FFTW_PLANS = collections.OrderedDict()
+_FFTW_PLANS_MAX = 4
+
+def _fftwExec(kind, x, shape=None):
+    """Run the cached pyFFTW plan for transform kind on a copy of x
+    
+    Returns the plan's output buffer, overwritten by the plan's next use.
+    """
+    key = (kind, x.shape, x.dtype, shape)
+    plan = _FFTW_PLANS.get(key)
+    if plan == None:
+        builder = getattr(pyfftw.builders, kind)
+        plan = builder(pyfftw.empty_aligned(x.shape, dtype=x.dtype), s=shape, threads=os.cpu_count())
+        _FFTW_PLANS[key] = plan
+        if len(_FFTW_PLANS) > _FFTW_PLANS_MAX:
+            _FFTW_PLANS.popitem(last=False)
+    else:
+        _FFTW_PLANS.move_to_end(key)
+    # copy in: multi-dimensional C2R transforms destroy their input
+    plan.input_array[...] = x
+    return plan()
+
 
 class SPProblem:
     """Base class for SpiralPy problem."""
@@ -54,6 +125,9 @@ class SPProblem:
 class SPSolver:
     """Base class for SpiralPy solver."""
     
+    # number of pointer arguments taken by the SPIRAL generated main function
+    _mainFuncArgCount = 2
+    
     def __init__(self, problem: SPProblem, namebase = 'func', opts = {}):
         self._problem = problem
         self._opts = opts
@@ -71,6 +145,11 @@ class SPSolver:
         self._metadata = dict()
         self._includeMetadata = self._opts.get(SP_OPT_METADATA, False)
         self._workdir = os.getenv(SP_WORKDIR)
+        self._xp = self._arrayModule()
+        self._fftBackend = self._selectFFTBackend()
+        self._fftPlans = dict()
+        self._padKey = None
+        self._padBuf = None
 
         # find and possibly create the .libs subdirectory
         # directory = Join ( site.USER_BASE, 'share', __package__, .libs )
@@ -95,7 +174,7 @@ class SPSolver:
         # and create one if no matching transform is in an existing installed library
         if not os.path.exists(sharedLibFullPath):
             searchmd = self._metadataForSearch()
-            (path, names) = findFunctionsWithMetadata(searchmd)
+            (path, names) = _findFunctionsCached(searchmd)
             if (type(path) is str) and (type(names) is dict) and (len(names) > 2):
                 sharedLibFullPath = path
                 self._mainFuncName    = names.get(SP_KEY_EXEC, self._mainFuncName)
@@ -104,11 +183,16 @@ class SPSolver:
             else:
                 self._setupCFuncs(self._namebase)
 
-        self._SharedLibAccess = ctypes.CDLL(sharedLibFullPath)
+        self._SharedLibAccess = _loadSharedLib(sharedLibFullPath)
+        # CDLL keeps each function it resolves as an attribute, so this
+        # lookup is only done by the dynamic linker the first time
         self._MainFunc = getattr(self._SharedLibAccess, self._mainFuncName)
         if self._MainFunc == None:
             msg = 'could not find function: ' + self._mainFuncName
             raise RuntimeError(msg)
+        # declare the signature once, so _func can pass raw addresses
+        self._MainFunc.argtypes = [ctypes.c_void_p] * self._mainFuncArgCount
+        self._MainFunc.restype = None
         self._initFunc()
 
     def __del__(self):
@@ -118,6 +202,31 @@ class SPSolver:
         except:
             pass
     
+    def _arrayModule(self):
+        """Array module (NumPy or CuPy) the solver works with, fixed by platform"""
+        return cp if (self._genCuda or self._genHIP) else np
+    
+    def _selectFFTBackend(self):
+        """Choose the host FFT library used by the Python definitions"""
+        requested = self._opts.get(SP_OPT_FFTBACKEND, os.getenv(SP_FFT_BACKEND))
+        backend = SP_FFT_SCIPY if requested == None else requested
+        # only an explicit request warns; the default falls back quietly
+        if requested == None:
+            pass
+        elif backend not in (SP_FFT_FFTW, SP_FFT_NUMPY, SP_FFT_SCIPY):
+            print(f'Warning: unknown FFT backend "{backend}", using default', file=sys.stderr)
+        elif (backend == SP_FFT_FFTW and pyfftw == None) or (backend == SP_FFT_SCIPY and spfft == None):
+            print(f'Warning: FFT backend "{backend}" is not installed, using fallback', file=sys.stderr)
+        if backend == SP_FFT_NUMPY:
+            return SP_FFT_NUMPY
+        if backend == SP_FFT_FFTW and pyfftw != None:
+            return SP_FFT_FFTW
+        if spfft != None:
+            return SP_FFT_SCIPY
+        if pyfftw != None:
+            return SP_FFT_FFTW
+        return SP_FFT_NUMPY
+    
     def solve(self):
         raise NotImplementedError()
 
@@ -217,11 +326,13 @@ class SPSolver:
 
         cmd += ' -DPY_LIBS_DIR=' + self._libsDir
         
+        # build with one job per core, the generated sources and metadata compile concurrently
+        jobs = str(os.cpu_count() or 1)
         if sys.platform == 'win32':
             ##  NOTE: Ensure Python installed on Windows is 64 bit
-            cmd += ' . && cmake --build . --config Release --target install'
+            cmd += ' . && cmake --build . --config Release --target install --parallel ' + jobs
         else:
-            cmd += ' . && make install'
+            cmd += ' . && make -j' + jobs + ' install'
             
         runResult = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         if runResult.returncode != 0:
@@ -295,24 +406,28 @@ class SPSolver:
     def _func(self, dst, src):
         """Call the SPIRAL generated main function"""
         
-        xp = sp.get_array_module(src)
+        xp = self._xp
         
         if xp == np: 
-            if self._genCuda or self._genHIP:
-                raise RuntimeError('GPU function requires CuPy arrays')
+            if not isinstance(src, np.ndarray):
+                raise RuntimeError('CPU function requires NumPy arrays')
             # NumPy array on CPU
-            return self._MainFunc( 
-                    dst.ctypes.data_as(ctypes.c_void_p),
-                    src.ctypes.data_as(ctypes.c_void_p) )
+            return self._MainFunc(dst.ctypes.data, src.ctypes.data)
         else:
-            if not self._genCuda and not self._genHIP:
-                raise RuntimeError('CPU function requires NumPy arrays')
+            if not isinstance(src, cp.ndarray):
+                raise RuntimeError('GPU function requires CuPy arrays')
             # CuPy array on GPU
-            srcdev = ctypes.cast(src.data.ptr, ctypes.POINTER(ctypes.c_void_p))
-            dstdev = ctypes.cast(dst.data.ptr, ctypes.POINTER(ctypes.c_void_p))
-            return self._MainFunc(dstdev, srcdev)
+            return self._MainFunc(dst.data.ptr, src.data.ptr)
 
         
+    def _scaleInPlace(self, dst, n):
+        """Divide the output of the SPIRAL function by n in place"""
+        xp = self._xp
+        if xp == np or _scaleKernel == None:
+            xp.divide(dst, n, out=dst)
+        else:
+            _scaleKernel(1.0 / n, dst)
+        
     def _destroyFunc(self):
         """Call the SPIRAL generated destroy function"""
         gf = getattr(self._SharedLibAccess, self._destroyFuncName, None)
@@ -322,9 +437,31 @@ class SPSolver:
             msg = 'could not find function: ' + self._destroyFuncName
             raise RuntimeError(msg)
 
-    def zeroEmbedBox(self, src, padding):
-        xp = sp.get_array_module(src)
-        retCube = xp.pad(src, padding)
+    def _zeroEmbedScratch(self, src, padding):
+        """ zero padded src in the solver's single reusable scratch buffer """
+        xp = self._xp
+        pads = tuple(tuple(padding[min(i, len(padding) - 1)]) for i in range(src.ndim))
+        key = (src.shape, src.dtype, pads)
+        if key != self._padKey:
+            shape = tuple(lo + n + hi for ((lo, hi), n) in zip(pads, src.shape))
+            self._padBuf = xp.zeros(shape, src.dtype)
+            self._padKey = key
+        # only the src region is ever written, so the padding stays zero
+        inner = tuple(slice(lo, lo + n) for ((lo, hi), n) in zip(pads, src.shape))
+        self._padBuf[inner] = src
+        return self._padBuf
+
+    def zeroEmbedBox(self, src, padding, scratch=False):
+        """ zero pad src by padding ((before, after) per axis)
+        
+        With scratch True the result is the solver's scratch buffer, which the
+        next scratch call overwrites; use it only for values consumed at once.
+        """
+        xp = self._xp
+        if scratch:
+            retCube = self._zeroEmbedScratch(src, padding)
+        else:
+            retCube = xp.pad(src, padding)
         if self._tracingOn:
             t1 = padding[0]
             t2 = padding[1] if len(padding) > 1 else t1
@@ -344,10 +481,66 @@ class SPSolver:
             self._callGraph.insert(0, st)
         return retCube
 		        
+    def _cupyFFTPlan(self, x, valueType, shape=None):
+        """ cuFFT plan for x, created once per shape and type
+        
+        CuPy caches plans itself; holding them here only saves its lookup.
+        """
+        key = (valueType, x.shape, x.dtype, shape)
+        plan = self._fftPlans.get(key)
+        if plan == None:
+            plan = cpfft.get_fft_plan(x, shape=shape, axes=tuple(range(x.ndim)), value_type=valueType)
+            self._fftPlans[key] = plan
+        return plan
+
+    def _execRfftn(self, x, scratch=False):
+        """ forward multi-dimensional real DFT, not traced
+        
+        With scratch True the result may be a buffer owned by a cached plan,
+        valid only until the next transform of the same shape.
+        """
+        xp = self._xp
+        if xp != np:
+            if cpfft == None:
+                return xp.fft.rfftn(x)
+            with self._cupyFFTPlan(x, 'R2C'):
+                return cpfft.rfftn(x)
+        if self._fftBackend == SP_FFT_NUMPY:
+            return np.fft.rfftn(x) # executes z, then y, then x
+        if self._fftBackend == SP_FFT_FFTW:
+            # plan owns its output buffer, which is reused by the next call
+            ret = _fftwExec('rfftn', x)
+            return ret if scratch else ret.copy()
+        # real transform on the contiguous last axis first, as one batch, then
+        # complex transforms axis by axis on the fresh C-ordered half-spectrum
+        ret = spfft.rfft(x, axis=-1, workers=-1)
+        for axis in reversed(range(x.ndim - 1)):
+            ret = spfft.fft(ret, axis=axis, workers=-1, overwrite_x=True)
+        return ret
+
+    def _execIrfftn(self, x, shape, overwrite=False):
+        """ inverse multi-dimensional real DFT, not traced
+        
+        With overwrite True the contents of x may be destroyed.
+        """
+        xp = self._xp
+        if xp != np:
+            if cpfft == None:
+                return xp.fft.irfftn(x, s=shape)
+            if cp.cuda.runtime.is_hip:
+                # hipFFT n-D C2R plans are disabled in CuPy, use its own planning
+                return cpfft.irfftn(x, s=shape)
+            with self._cupyFFTPlan(x, 'C2R', tuple(shape)):
+                return cpfft.irfftn(x, s=shape)
+        if self._fftBackend == SP_FFT_NUMPY:
+            return np.fft.irfftn(x, s=shape) # executes x, then y, then z
+        if self._fftBackend == SP_FFT_FFTW:
+            return _fftwExec('irfftn', x, tuple(shape)).copy()
+        return spfft.irfftn(x, s=shape, workers=-1, overwrite_x=overwrite)
+
     def rfftn(self, x):
         """ forward multi-dimensional real DFT """
-        xp = sp.get_array_module(x)
-        ret = xp.fft.rfftn(x) # executes z, then y, then x
+        ret = self._execRfftn(x)
         if self._tracingOn:
             n1 = x.shape[0]
             n2 = x.shape[1]
@@ -357,10 +550,24 @@ class SPSolver:
             self._callGraph.insert(0, st)
         return ret
 
+    def _canMultiplyInPlace(self, x, y):
+        """ True if x * y can be written into x without changing the result """
+        # CuPy arrays have no writeable flag
+        return (np.broadcast_shapes(x.shape, np.shape(y)) == x.shape
+                and x.dtype == self._xp.result_type(x, y)
+                and getattr(x.flags, 'writeable', True))
+
     def pointwise(self, x, y):
-        """ pointwise array multiplication """
-        xp = sp.get_array_module(x)
-        ret = x * y
+        """ pointwise array multiplication
+        
+        Outside tracing the product is written into x when that gives the
+        same result, since x (the forward transform) is not needed afterwards.
+        """
+        xp = self._xp
+        if self._tracingOn or not self._canMultiplyInPlace(x, y):
+            ret = x * y
+        else:
+            ret = xp.multiply(x, y, out=x)
         if self._tracingOn:
             nElems = xp.size(x) * 2
             st = 'RCDiag(FDataOfs(symvar, ' + str(nElems) + ', 0))'
@@ -369,8 +576,7 @@ class SPSolver:
 
     def irfftn(self, x, shape):
         """ inverse multi-dimensional real DFT """
-        xp = sp.get_array_module(x)
-        ret = xp.fft.irfftn(x, s=shape) # executes x, then y, then z
+        ret = self._execIrfftn(x, shape)
         if self._tracingOn:
             n1 = shape[0]
             n2 = shape[1]
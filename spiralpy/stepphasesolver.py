@@ -35,6 +35,8 @@ class StepPhaseProblem(SPProblem):
         
 
 class StepPhaseSolver(SPSolver):
+    _mainFuncArgCount = 3
+    
     def __init__(self, problem: StepPhaseProblem, opts = {}):
         if not isinstance(problem, StepPhaseProblem):
             raise TypeError("problem must be a StepPhaseProblem")